@@ -1,17 +1,18 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
-import json
-from typing import Dict, Any, Optional
+import bisect
+import math
+from typing import NamedTuple, Optional
 import re
-import time
-from urllib.parse import quote
+import numpy as np
+import orjson
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 from get_data import YahooKeyMetricsExtractor
 
+# Yahoo ticker shape: letters/digits plus any number of exchange or class suffixes
+# (BRK-B, SHOP.TO, BBD-B.TO, RY-PR-A.TO, DX-Y.NYB, M&M.NS, ^GSPC, EURUSD=X, option contracts)
+_TICKER_RE = re.compile(r'^\^?[A-Z0-9&]{1,21}(?:[.\-=][A-Z0-9&]{1,4})*$')
+
 # Set page config
 st.set_page_config(
     page_title="Stock Valuation Analyzer",
@@ -21,132 +22,157 @@ st.set_page_config(
 )
 
 
+@st.cache_resource
+def _get_extractor():
+    """Shared extractor instance, reused across reruns and sessions"""
+    return YahooKeyMetricsExtractor()
+
+class MetricsFetchError(Exception):
+    """Raised for failed fetches so st.cache_data does not keep the error result"""
+
+@st.cache_data(ttl=900, show_spinner=False)
+def _cached_metrics(symbol):
+    """Fetch key metrics for a symbol, cached for 15 minutes"""
+    metrics = _get_extractor().get_key_metrics(symbol)
+    if metrics.get('error'):
+        raise MetricsFetchError(metrics['error'])
+    return metrics
+
+class AdditionalMetrics(NamedTuple):
+    """Derived metrics computed from the scraped key metrics"""
+    peg_ratio: Optional[float] = None
+    estimated_eps: Optional[float] = None
+    dividend_coverage_ratio: Optional[float] = None
+    estimated_pb_ratio: Optional[float] = None
+
+@st.cache_data(show_spinner=False)
 def calculate_additional_metrics(metrics):
     """Calculate additional financial metrics"""
-    additional_metrics = {}
+    pe = metrics.get('pe_ratio_ttm')
+    growth = metrics.get('growth_estimate_next_year')
+    price = metrics.get('current_price')
+    dividend_rate = metrics.get('forward_dividend_rate')
+    
+    peg_ratio = estimated_eps = dividend_coverage_ratio = estimated_pb_ratio = None
     
-    # PEG Ratio (PE / Growth Rate)
-    if metrics.get('pe_ratio_ttm') and metrics.get('growth_estimate_next_year'):
-        if metrics['growth_estimate_next_year'] != 0:
-            additional_metrics['peg_ratio'] = metrics['pe_ratio_ttm'] / metrics['growth_estimate_next_year']
+    if pe and growth:
+        # PEG Ratio (PE / Growth Rate)
+        peg_ratio = pe / growth
+        # Price to Book approximation (simplified)
+        # Rough estimation: PB = PE * ROE, assuming ROE relates to growth
+        estimated_pb_ratio = pe * (growth / 100)
     
     # Dividend Coverage Ratio (simplified estimation)
-    if metrics.get('forward_dividend_rate') and metrics.get('current_price') and metrics.get('pe_ratio_ttm'):
-        eps = metrics['current_price'] / metrics['pe_ratio_ttm'] if metrics['pe_ratio_ttm'] != 0 else None
+    if dividend_rate and price and pe:
+        eps = price / pe
         if eps:
-            additional_metrics['estimated_eps'] = eps
-            if metrics['forward_dividend_rate'] != 0:
-                additional_metrics['dividend_coverage_ratio'] = eps / metrics['forward_dividend_rate']
-    
-    # Price to Book approximation (simplified)
-    if metrics.get('pe_ratio_ttm') and metrics.get('growth_estimate_next_year'):
-        # Rough estimation: PB = PE * ROE, assuming ROE relates to growth
-        estimated_roe = metrics['growth_estimate_next_year'] / 100 if metrics['growth_estimate_next_year'] else 0.1
-        additional_metrics['estimated_pb_ratio'] = metrics['pe_ratio_ttm'] * estimated_roe
+            estimated_eps = eps
+            dividend_coverage_ratio = eps / dividend_rate
     
-    return additional_metrics
+    return AdditionalMetrics(peg_ratio, estimated_eps, dividend_coverage_ratio, estimated_pb_ratio)
+
+class Valuation(NamedTuple):
+    """Valuation score, status and fair value estimates for a stock"""
+    valuation_score: float
+    valuation_status: str
+    peg_based_fair_value: Optional[float] = None
+    dividend_growth_fair_value: Optional[float] = None
+
+# Upper bounds of each valuation score band; the first sits just below 1.0
+# so a score of exactly 1 counts as fairly valued
+_VALUATION_THRESHOLDS = (math.nextafter(1.0, 0.0), 1.5, 2.0)
+_VALUATION_STATUSES = ("🚩 Overvalued", "✅ Fairly Valued", "📈 Neutral", "📈 Undervalued")
+
+# Assuming required return of 10%
+_REQUIRED_RETURN = 0.10
 
+@st.cache_data(show_spinner=False)
 def calculate_valuation_metrics(current_price, pe_ratio, growth_rate, dividend_yield):
-    """Calculate various valuation metrics"""
-    valuations = {}
+    """Calculate various valuation metrics, or None if the inputs are incomplete"""
+    if not (current_price and pe_ratio) or growth_rate is None or dividend_yield is None:
+        return None
     
-    if all([current_price, pe_ratio, growth_rate is not None, dividend_yield is not None]):
-        # PEG-based valuation
-        if growth_rate != 0:
-            fair_pe = growth_rate  # Simple PEG = 1 assumption
-            valuations['peg_based_fair_value'] = (current_price / pe_ratio) * fair_pe
-        
-        # Dividend Growth Model (simplified)
-        if dividend_yield > 0:
-            dividend_per_share = current_price * (dividend_yield / 100)
-            # Assuming required return of 10%
-            required_return = 0.10
-            growth_rate_decimal = growth_rate / 100 if growth_rate else 0.05
-            if required_return > growth_rate_decimal:
-                valuations['dividend_growth_fair_value'] = dividend_per_share * (1 + growth_rate_decimal) / (required_return - growth_rate_decimal)
-        
-        # Combined valuation score
-        peg_value = (growth_rate + dividend_yield) / pe_ratio if pe_ratio != 0 else 0
-        valuations['valuation_score'] = peg_value
-        
-        if peg_value < 1:
-            valuations['valuation_status'] = "🚩 Overvalued"
-        elif 1 <= peg_value <= 1.5:
-            valuations['valuation_status'] = "✅ Fairly Valued"
-        elif 1.5 < peg_value <= 2:
-            valuations['valuation_status'] = "📈 Neutral"
-        else:
-            valuations['valuation_status'] = "📈 Undervalued"
+    # PEG-based valuation (simple PEG = 1 assumption, so fair P/E equals growth)
+    peg_based_fair_value = (current_price / pe_ratio) * growth_rate if growth_rate else None
+    
+    # Dividend Growth Model (simplified)
+    dividend_growth_fair_value = None
+    if dividend_yield > 0:
+        dividend_per_share = current_price * (dividend_yield / 100)
+        growth_rate_decimal = growth_rate / 100 if growth_rate else 0.05
+        if _REQUIRED_RETURN > growth_rate_decimal:
+            dividend_growth_fair_value = dividend_per_share * (1 + growth_rate_decimal) / (_REQUIRED_RETURN - growth_rate_decimal)
+    
+    # Combined valuation score
+    peg_value = (growth_rate + dividend_yield) / pe_ratio
+    status = _VALUATION_STATUSES[bisect.bisect_left(_VALUATION_THRESHOLDS, peg_value)]
     
-    return valuations
+    return Valuation(peg_value, status, peg_based_fair_value, dividend_growth_fair_value)
+
+# Chart layouts are validated once at import and copied into each new figure
+_VALUATION_LAYOUT = go.Layout(
+    title='Stock Valuation Comparison',
+    xaxis_title='Valuation Methods',
+    yaxis_title='Price ($)',
+    template='plotly_dark',
+    showlegend=False  # one bar trace; the x axis already names each bar
+)
+_RADAR_LAYOUT = go.Layout(
+    polar=dict(
+        radialaxis=dict(
+            visible=True,
+            range=[0, 100]
+        )),
+    showlegend=True,
+    title="Stock Performance Radar",
+    template='plotly_dark'
+)
+_FAIR_VALUE_COLORS = ('#4ecdc4', '#45b7d1', '#96ceb4', '#feca57')
 
-def create_valuation_chart(current_price, fair_values):
+@st.cache_resource(max_entries=128, show_spinner=False)
+def create_valuation_chart(current_price, peg_fair_value=None, dividend_fair_value=None):
     """Create a valuation comparison chart"""
-    fig = go.Figure()
+    fair_values = {}
+    if peg_fair_value:
+        fair_values['PEG Based'] = peg_fair_value
+    if dividend_fair_value:
+        fair_values['Dividend Growth'] = dividend_fair_value
     
-    # Current price bar
-    fig.add_trace(go.Bar(
-        x=['Current Price'],
-        y=[current_price],
-        name='Current Price',
-        marker_color='#ff6b6b'
-    ))
-    
-    # Fair value bars
-    colors = ['#4ecdc4', '#45b7d1', '#96ceb4', '#feca57']
+    # Current price first, then each positive fair value, all in a single trace
+    names = ['Current Price']
+    values = [current_price]
+    colors = ['#ff6b6b']
     for i, (method, value) in enumerate(fair_values.items()):
         if value and value > 0:
-            fig.add_trace(go.Bar(
-                x=[method.replace('_', ' ').title()],
-                y=[value],
-                name=method.replace('_', ' ').title(),
-                marker_color=colors[i % len(colors)]
-            ))
+            names.append(method.replace('_', ' ').title())
+            values.append(value)
+            colors.append(_FAIR_VALUE_COLORS[i % len(_FAIR_VALUE_COLORS)])
     
-    fig.update_layout(
-        title='Stock Valuation Comparison',
-        xaxis_title='Valuation Methods',
-        yaxis_title='Price ($)',
-        template='plotly_dark',
-        showlegend=True
-    )
+    fig = go.Figure(go.Bar(x=names, y=values, marker_color=colors), layout=_VALUATION_LAYOUT)
     
     return fig
 
-def create_metrics_radar_chart(metrics):
+# Radar axes with their linear normalization onto a 0-100 scale
+_RADAR_CATEGORIES = np.array([
+    'P/E Ratio<br>(Lower is Better)',        # inverse scale, 0-40 range
+    'Growth Rate<br>(Higher is Better)',     # 0-30% range
+    'Dividend Yield<br>(Higher is Better)',  # 0-10% range
+    'PEG Ratio<br>(Lower is Better)',        # inverse scale, 0-3 range
+])
+_RADAR_SCALE = np.array([-2.5, 3.33, 10.0, -33.33])
+_RADAR_OFFSET = np.array([100.0, 0.0, 0.0, 100.0])
+
+@st.cache_resource(max_entries=128, show_spinner=False)
+def create_metrics_radar_chart(pe_ratio=None, growth_rate=None, dividend_yield=None, peg_ratio=None):
     """Create a radar chart for key metrics"""
-    # Normalize metrics for radar chart
-    categories = []
-    values = []
-    
-    if metrics.get('pe_ratio_ttm'):
-        categories.append('P/E Ratio<br>(Lower is Better)')
-        # Normalize PE ratio (inverse scale, 0-40 range)
-        pe_normalized = max(0, min(100, 100 - (metrics['pe_ratio_ttm'] * 2.5)))
-        values.append(pe_normalized)
-    
-    if metrics.get('growth_estimate_next_year'):
-        categories.append('Growth Rate<br>(Higher is Better)')
-        # Normalize growth rate (0-30% range)
-        growth_normalized = max(0, min(100, metrics['growth_estimate_next_year'] * 3.33))
-        values.append(growth_normalized)
-    
-    if metrics.get('forward_dividend_yield'):
-        categories.append('Dividend Yield<br>(Higher is Better)')
-        # Normalize dividend yield (0-10% range)
-        div_normalized = max(0, min(100, metrics['forward_dividend_yield'] * 10))
-        values.append(div_normalized)
-    
-    # Add PEG ratio if available
-    additional_metrics = calculate_additional_metrics(metrics)
-    if additional_metrics.get('peg_ratio'):
-        categories.append('PEG Ratio<br>(Lower is Better)')
-        # Normalize PEG ratio (inverse scale, 0-3 range)
-        peg_normalized = max(0, min(100, 100 - (additional_metrics['peg_ratio'] * 33.33)))
-        values.append(peg_normalized)
+    # Normalize metrics for radar chart in one pass: clip(raw * scale + offset, 0, 100)
+    raw = np.array([pe_ratio, growth_rate, dividend_yield, peg_ratio], dtype=float)
+    present = np.nan_to_num(raw) != 0
+    categories = _RADAR_CATEGORIES[present].tolist()
+    values = np.clip(raw[present] * _RADAR_SCALE[present] + _RADAR_OFFSET[present], 0, 100).tolist()
     
     if len(categories) >= 3:  # Only create radar chart if we have enough data
-        fig = go.Figure()
+        fig = go.Figure(layout=_RADAR_LAYOUT)
         
         fig.add_trace(go.Scatterpolar(
             r=values,
@@ -156,21 +182,80 @@ def create_metrics_radar_chart(metrics):
             line_color='#4ecdc4'
         ))
         
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 100]
-                )),
-            showlegend=True,
-            title="Stock Performance Radar",
-            template='plotly_dark'
-        )
-        
         return fig
     
     return None
 
+# Insight rules: (metric key, low, high, text below low, text in between, text above high)
+_INSIGHT_RULES = (
+    ('pe_ratio_ttm', 15, 25,
+     "✅ **Low P/E Ratio**: Stock appears undervalued based on earnings",
+     "📊 **Moderate P/E Ratio**: Reasonable valuation based on earnings",
+     "⚠️ **High P/E Ratio**: Stock may be overvalued or high-growth"),
+    ('growth_estimate_next_year', 5, 15,
+     "⚠️ **Low Growth Expected**: Limited growth potential",
+     None,
+     "🚀 **High Growth Expected**: Strong growth estimates for next year"),
+    ('forward_dividend_yield', 2, 4,
+     "📈 **Low Dividend Yield**: Growth-focused rather than income",
+     None,
+     "💰 **High Dividend Yield**: Good income-generating potential"),
+    ('peg_ratio', 1, 2,
+     "⭐ **Attractive PEG Ratio**: Growth appears reasonably priced",
+     None,
+     "⚠️ **High PEG Ratio**: Growth may be overpriced"),
+)
+
+def build_insights(values):
+    """Generate investment insight messages from metric values"""
+    insights = []
+    for key, low, high, below, between, above in _INSIGHT_RULES:
+        value = values.get(key)
+        if not value:
+            continue
+        text = below if value < low else above if value > high else between
+        if text:
+            insights.append(text)
+    return insights
+
+def _valuation_section(metrics, valuations, fair_values):
+    """Render the valuation chart and fair value metrics"""
+    # Create valuation chart
+    fig = create_valuation_chart(
+        metrics['current_price'],
+        valuations.peg_based_fair_value,
+        valuations.dividend_growth_fair_value
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Show fair values in columns
+    cols = st.columns(len(fair_values) + 1)
+    
+    with cols[0]:
+        st.metric("Current Price", f"${metrics['current_price']:.2f}")
+    
+    for i, (method, value) in enumerate(fair_values.items()):
+        with cols[i + 1]:
+            delta = value - metrics['current_price']
+            delta_pct = (delta / metrics['current_price']) * 100
+            st.metric(
+                f"{method} Fair Value",
+                f"${value:.2f}",
+                f"{delta_pct:+.1f}%"
+            )
+
+def _radar_section(metrics, additional_metrics):
+    """Render the performance radar chart"""
+    radar_fig = create_metrics_radar_chart(
+        metrics.get('pe_ratio_ttm'),
+        metrics.get('growth_estimate_next_year'),
+        metrics.get('forward_dividend_yield'),
+        additional_metrics.peg_ratio
+    )
+    if radar_fig:
+        st.subheader("🎯 Performance Radar Chart")
+        st.plotly_chart(radar_fig, use_container_width=True)
+
 # Streamlit App
 def main():
     # Title and description
@@ -185,7 +270,7 @@ def main():
             "Enter Stock Symbol:",
             value="AAPL",
             help="Enter a valid stock ticker symbol (e.g., AAPL, MSFT, GOOGL)"
-        ).upper()
+        ).strip().upper()
         
         # Analysis button
         analyze_button = st.button("🚀 Analyze Stock", type="primary")
@@ -195,18 +280,29 @@ def main():
         st.markdown("• Fetches real-time data from Yahoo Finance")
         st.markdown("• Calculates multiple valuation metrics")
         st.markdown("• Provides comprehensive analysis")
+        
+        st.markdown("---")
+        if st.button("🧹 Clear cache", help="Discard cached Yahoo Finance data"):
+            _cached_metrics.clear()
+            _get_extractor().clear()
+            if _get_extractor().file_cache:
+                _get_extractor().file_cache.clear()
     
     # Main content area
     if analyze_button and stock_symbol:
+        # Reject malformed symbols before spending a network round trip on them
+        if not _TICKER_RE.match(stock_symbol):
+            st.error(f"❌ Error: '{stock_symbol}' is not a valid ticker symbol")
+            return
+        
         # Show loading spinner
         with st.spinner(f'Analyzing {stock_symbol}... Please wait.'):
-            # Initialize extractor and get metrics
-            extractor = YahooKeyMetricsExtractor()
-            metrics = extractor.get_key_metrics(stock_symbol)
-        
-        if metrics.get('error'):
-            st.error(f"❌ Error: {metrics['error']}")
-            return
+            # Get metrics (cached per symbol; failures are not cached and are retried next time)
+            try:
+                metrics = _cached_metrics(stock_symbol)
+            except MetricsFetchError as e:
+                st.error(f"❌ Error: {e}")
+                return
         
         # Display basic stock info
         col1, col2, col3 = st.columns(3)
@@ -248,10 +344,10 @@ def main():
         additional_metrics = calculate_additional_metrics(metrics)
         
         with col6:
-            if additional_metrics.get('peg_ratio'):
+            if additional_metrics.peg_ratio:
                 st.metric(
                     label="⚡ PEG Ratio",
-                    value=f"{additional_metrics['peg_ratio']:.2f}"
+                    value=f"{additional_metrics.peg_ratio:.2f}"
                 )
             else:
                 st.metric(label="⚡ PEG Ratio", value="N/A")
@@ -279,42 +375,24 @@ def main():
             with col1:
                 st.metric(
                     label="🔢 Valuation Score",
-                    value=f"{valuations['valuation_score']:.2f}",
+                    value=f"{valuations.valuation_score:.2f}",
                     help="(Growth Rate + Dividend Yield) / PE Ratio"
                 )
             
             with col2:
-                st.markdown(f"### {valuations['valuation_status']}")
+                st.markdown(f"### {valuations.valuation_status}")
             
             # Fair value estimations
             st.subheader("💡 Fair Value Estimations")
             
             fair_values = {}
-            if valuations.get('peg_based_fair_value'):
-                fair_values['PEG Based'] = valuations['peg_based_fair_value']
-            if valuations.get('dividend_growth_fair_value'):
-                fair_values['Dividend Growth'] = valuations['dividend_growth_fair_value']
+            if valuations.peg_based_fair_value:
+                fair_values['PEG Based'] = valuations.peg_based_fair_value
+            if valuations.dividend_growth_fair_value:
+                fair_values['Dividend Growth'] = valuations.dividend_growth_fair_value
             
             if fair_values:
-                # Create valuation chart
-                fig = create_valuation_chart(metrics['current_price'], fair_values)
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Show fair values in columns
-                cols = st.columns(len(fair_values) + 1)
-                
-                with cols[0]:
-                    st.metric("Current Price", f"${metrics['current_price']:.2f}")
-                
-                for i, (method, value) in enumerate(fair_values.items()):
-                    with cols[i + 1]:
-                        delta = value - metrics['current_price']
-                        delta_pct = (delta / metrics['current_price']) * 100
-                        st.metric(
-                            f"{method} Fair Value",
-                            f"${value:.2f}",
-                            f"{delta_pct:+.1f}%"
-                        )
+                _valuation_section(metrics, valuations, fair_values)
             
         else:
             st.warning("⚠️ Insufficient data for complete valuation analysis")
@@ -324,70 +402,42 @@ def main():
         # Additional Financial Metrics
         st.header("📊 Additional Financial Metrics")
         
-        # Create metrics dataframe
-        metrics_data = []
+        # Create metrics dataframe columns
+        metric_names = []
+        metric_values = []
         
-        if additional_metrics.get('estimated_eps'):
-            metrics_data.append({"Metric": "Estimated EPS", "Value": f"${additional_metrics['estimated_eps']:.2f}"})
+        if additional_metrics.estimated_eps:
+            metric_names.append("Estimated EPS")
+            metric_values.append(f"${additional_metrics.estimated_eps:.2f}")
         
-        if additional_metrics.get('dividend_coverage_ratio'):
-            metrics_data.append({"Metric": "Dividend Coverage Ratio", "Value": f"{additional_metrics['dividend_coverage_ratio']:.2f}x"})
+        if additional_metrics.dividend_coverage_ratio:
+            metric_names.append("Dividend Coverage Ratio")
+            metric_values.append(f"{additional_metrics.dividend_coverage_ratio:.2f}x")
         
-        if additional_metrics.get('estimated_pb_ratio'):
-            metrics_data.append({"Metric": "Estimated P/B Ratio", "Value": f"{additional_metrics['estimated_pb_ratio']:.2f}"})
+        if additional_metrics.estimated_pb_ratio:
+            metric_names.append("Estimated P/B Ratio")
+            metric_values.append(f"{additional_metrics.estimated_pb_ratio:.2f}")
         
         # Market cap estimation (simplified)
-        if metrics['current_price'] and additional_metrics.get('estimated_eps'):
+        if metrics['current_price'] and additional_metrics.estimated_eps:
             shares_outstanding_est = 1000000000  # Rough estimation
             market_cap_est = metrics['current_price'] * shares_outstanding_est / 1000000000
-            metrics_data.append({"Metric": "Est. Market Cap", "Value": f"${market_cap_est:.1f}B"})
+            metric_names.append("Est. Market Cap")
+            metric_values.append(f"${market_cap_est:.1f}B")
         
-        if metrics_data:
-            df = pd.DataFrame(metrics_data)
-            st.dataframe(df, use_container_width=True)
+        if metric_names:
+            df = pd.DataFrame({"Metric": metric_names, "Value": metric_values})
+            st.dataframe(df, use_container_width=True, hide_index=True)
         
         # Radar chart
-        radar_fig = create_metrics_radar_chart(metrics)
-        if radar_fig:
-            st.subheader("🎯 Performance Radar Chart")
-            st.plotly_chart(radar_fig, use_container_width=True)
+        _radar_section(metrics, additional_metrics)
         
         st.markdown("---")
         
         # Investment Insights
         st.header("💡 Investment Insights")
         
-        insights = []
-        
-        # PE Ratio insights
-        if metrics.get('pe_ratio_ttm'):
-            if metrics['pe_ratio_ttm'] < 15:
-                insights.append("✅ **Low P/E Ratio**: Stock appears undervalued based on earnings")
-            elif metrics['pe_ratio_ttm'] > 25:
-                insights.append("⚠️ **High P/E Ratio**: Stock may be overvalued or high-growth")
-            else:
-                insights.append("📊 **Moderate P/E Ratio**: Reasonable valuation based on earnings")
-        
-        # Growth insights
-        if metrics.get('growth_estimate_next_year'):
-            if metrics['growth_estimate_next_year'] > 15:
-                insights.append("🚀 **High Growth Expected**: Strong growth estimates for next year")
-            elif metrics['growth_estimate_next_year'] < 5:
-                insights.append("⚠️ **Low Growth Expected**: Limited growth potential")
-        
-        # Dividend insights
-        if metrics.get('forward_dividend_yield'):
-            if metrics['forward_dividend_yield'] > 4:
-                insights.append("💰 **High Dividend Yield**: Good income-generating potential")
-            elif metrics['forward_dividend_yield'] < 2:
-                insights.append("📈 **Low Dividend Yield**: Growth-focused rather than income")
-        
-        # PEG insights
-        if additional_metrics.get('peg_ratio'):
-            if additional_metrics['peg_ratio'] < 1:
-                insights.append("⭐ **Attractive PEG Ratio**: Growth appears reasonably priced")
-            elif additional_metrics['peg_ratio'] > 2:
-                insights.append("⚠️ **High PEG Ratio**: Growth may be overpriced")
+        insights = build_insights({**metrics, 'peg_ratio': additional_metrics.peg_ratio})
         
         for insight in insights:
             st.markdown(insight)
@@ -397,7 +447,8 @@ def main():
         
         # Raw data expander
         with st.expander("🔍 View Raw Data"):
-            st.json({**metrics, **additional_metrics})
+            raw_data = {**metrics, **{k: v for k, v in additional_metrics._asdict().items() if v is not None}}
+            st.code(orjson.dumps(raw_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode(), language='json')
         
         # Disclaimer
         st.markdown("---")
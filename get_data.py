@@ -1,27 +1,230 @@
 # yahoo_key_metrics_corrected.py
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+from lxml import etree
+import orjson
+from selectolax.lexbor import LexborHTMLParser
+import asyncio
+import base64
+import hashlib
+import io
 import json
-from typing import Dict, Any, Optional
+import os
+import random
+import tempfile
+import threading
+from typing import Dict, Any, List, Optional, Set, Tuple
 import re
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
 from urllib.parse import quote
 
 
+# Precompiled patterns shared by the extraction helpers
+_PRICE_RE = re.compile(r'^\d{1,4}\.\d{2}$')  # e.g. "201.18"
+_NUMBER_RE = re.compile(r'\d+\.?\d*')
+_PERCENT_RE = re.compile(r'\d+\.?\d*%')
+_DIVIDEND_RE = re.compile(r'(\d+\.?\d*)\s*\((\d+\.?\d*%?)\)')  # e.g. "0.25 (1.2%)"
+
+
+class _NumericChars(dict):
+    """str.translate table keeping digits, '.' and '-'; other code points are deleted and memoized"""
+    
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        char = chr(codepoint)
+        kept = codepoint if char.isdecimal() or char in '.-' else None
+        self[codepoint] = kept
+        return kept
+
+
+_NUMERIC_CHARS = _NumericChars()
+_MISSING_VALUES = frozenset({'N/A', 'NA', '--', '', 'NULL'})
+_BARE_SIGNS = frozenset({'-', '.', '-.'})
+
+# Every label _extract_from_tables acts on contains one of these
+_TABLE_LABEL_KEYS = ('pe ratio', 'p/e ratio', 'dividend')
+
+# Lower-cased growth table headers that mark the next-year column
+_NEXT_YEAR_HEADER_KEYS = ('next year', 'next 5 years', '2025', '2024')
+
+# How long cached pages stay fresh: prices move, analyst estimates rarely do
+SUMMARY_TTL_SECONDS = 15 * 60
+ANALYSIS_TTL_SECONDS = 24 * 60 * 60
+
+
+class FileCache:
+    """Store raw HTTP response bodies on disk, one JSON file per URL"""
+    
+    def __init__(self, cache_dir: str = '.cache'):
+        self.cache_dir = cache_dir
+    
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.md5(url.encode('utf-8')).hexdigest() + '.json')
+    
+    def get(self, url: str, ttl_seconds: float) -> Optional[Tuple[int, bytes, Optional[str]]]:
+        """Return (status, body, encoding) for a fresh cached response, else None"""
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if time.time() - entry['fetched_at'] > ttl_seconds:
+                return None
+            return entry['status'], base64.b64decode(entry['body_b64']), entry['encoding']
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    def set(self, url: str, status: int, body: bytes, encoding: Optional[str]):
+        """Write a response through to disk, replacing any previous entry"""
+        entry = {
+            'url': url,
+            'fetched_at': time.time(),
+            'status': status,
+            'encoding': encoding,
+            'body_b64': base64.b64encode(body).decode('ascii')
+        }
+        path = self._path(url)
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # A unique temp file per write, so concurrent writers of one URL never share it
+            fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing cache entry for {url}: {str(e)}")
+            if tmp_path:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+    
+    def clear(self):
+        """Remove all cached responses"""
+        try:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.cache_dir, name))
+        except OSError:
+            pass
+
+
+class RateLimiter:
+    """Thread-safe token bucket with a shared back-off window for throttled responses"""
+    
+    def __init__(self, refill_rate: float = 5.0, capacity: int = 10):
+        self.refill_rate = refill_rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping only while the bucket is empty or a back-off is active"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+                self.last_refill = now
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.refill_rate
+            time.sleep(wait)
+    
+    def back_off(self, delay: float):
+        """Hold every caller for at least delay seconds"""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+
+
 class YahooKeyMetricsExtractor:
     """Extract specific key metrics from Yahoo Finance"""
     
-    def __init__(self):
+    # Summary page value cells and the metric each one feeds
+    TEST_IDS = {
+        'PE_RATIO-value': 'pe_ratio_ttm',
+        'FORWARD_DIVIDEND_AND_YIELD-value': 'forward_dividend_yield',
+        'TD_DIVIDEND_AND_YIELD-value': 'forward_dividend_yield'
+    }
+    
+    # Fields each value cell reports; a cell that is present but yields nothing (e.g. "-- (--)") means they are absent
+    TEST_ID_FIELDS = {
+        'pe_ratio_ttm': ('pe_ratio_ttm',),
+        'forward_dividend_yield': ('forward_dividend_rate', 'forward_dividend_yield')
+    }
+    
+    # Fields the BeautifulSoup fallback extractors fill; the fallback is skipped once all are set
+    SUMMARY_FIELDS = ('pe_ratio_ttm', 'forward_dividend_rate', 'forward_dividend_yield')
+    
+    # quoteSummary modules holding the key metrics
+    QUOTE_SUMMARY_MODULES = 'price,summaryDetail,earningsTrend'
+    # When the API leaves any of these unset, the HTML page that supplies them is scraped
+    SUMMARY_PAGE_FIELDS = ('current_price', 'pe_ratio_ttm')
+    ANALYSIS_PAGE_FIELDS = ('growth_estimate_next_year',)
+    CRUMB_RETRY_SECONDS = 300
+    
+    # Retries after a 429/503 response, starting from THROTTLE_BACKOFF_BASE seconds
+    MAX_THROTTLE_RETRIES = 3
+    THROTTLE_BACKOFF_BASE = 1.0
+    # Longest back-off we hold callers for; a longer Retry-After returns the throttled response instead
+    MAX_THROTTLE_DELAY = 30.0
+    
+    def __init__(self, cache_dir: Optional[str] = '.cache', ttl: float = 900, warm_up: bool = True):
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate",
+            # Every encoding urllib3 can decode here: gzip/deflate, plus br when brotli is installed
+            "Accept-Encoding": ACCEPT_ENCODING,
             "Connection": "keep-alive",
             "Upgrade-Insecure-Requests": "1",
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        # Keep connections to Yahoo alive and pooled so repeat fetches skip the TCP/TLS handshake
+        # 429/503 are left to _get so the rate limiter sees them and backs off
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[500, 502, 504],
+                allowed_methods=['GET'],
+                raise_on_status=False
+            )
+        )
+        self.session.mount('https://', adapter)
+        # Requests only wait when the token bucket runs dry or Yahoo asks us to slow down
+        self.rate_limiter = RateLimiter()
+        # Responses persisted on disk survive restarts; pass cache_dir=None to disable
+        self.file_cache = FileCache(cache_dir) if cache_dir else None
+        # quoteSummary API crumb, fetched lazily once per session
+        self._crumb: Optional[str] = None
+        self._crumb_retry_at = 0.0
+        self._crumb_lock = threading.Lock()
+        # Recent per-symbol results, as {symbol: (fetched_at, metrics)}
+        self._cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._ttl = ttl
+        
+        if warm_up:
+            self._warm_up()
+    
+    def _warm_up(self):
+        """Collect Yahoo's consent cookies and open a pooled connection before the first symbol"""
+        try:
+            self.rate_limiter.acquire()
+            self.session.get('https://finance.yahoo.com', timeout=15)
+        except requests.RequestException:
+            # Best effort only; the first real request will simply pay for the redirect instead
+            pass
     
     def get_key_metrics(self, symbol: str) -> Dict[str, Any]:
         """
@@ -33,8 +236,14 @@ class YahooKeyMetricsExtractor:
         Returns:
             Dict containing the key metrics
         """
+        # Normalised once here; every helper below receives the upper-cased symbol
+        symbol = symbol.upper()
+        cached = self._cache.get(symbol)
+        if cached and time.time() - cached[0] < self._ttl:
+            return dict(cached[1])
+        
         metrics = {
-            'symbol': symbol.upper(),
+            'symbol': symbol,
             'current_price': None,
             'pe_ratio_ttm': None,
             'forward_dividend_rate': None,
@@ -44,141 +253,314 @@ class YahooKeyMetricsExtractor:
         }
         
         try:
-            # Get PE Ratio, Dividend info, and Current Price from summary page
-            summary_metrics = self._get_summary_metrics(symbol)
-            metrics.update(summary_metrics)
+            # Try the compact JSON API first; the HTML pages are only scraped for what it lacks
+            metrics.update(self._get_via_quote_summary(symbol))
             
-            # Small delay between requests
-            time.sleep(1)
+            # Each page is fetched only when the API left one of the fields it is needed for unset
+            need_summary = any(metrics[key] is None for key in self.SUMMARY_PAGE_FIELDS)
+            need_analysis = any(metrics[key] is None for key in self.ANALYSIS_PAGE_FIELDS)
             
-            # Get Growth Estimates from analysis page
-            growth_metrics = self._get_growth_estimates(symbol)
-            metrics.update(growth_metrics)
+            if need_summary or need_analysis:
+                base_url = f"https://finance.yahoo.com/quote/{quote(symbol)}"
+                
+                # Fetch the pages concurrently; parsing stays on this thread
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    summary_page = executor.submit(self._fetch, base_url, SUMMARY_TTL_SECONDS) if need_summary else None
+                    analysis_page = executor.submit(self._fetch, f"{base_url}/analysis", ANALYSIS_TTL_SECONDS) if need_analysis else None
+                    
+                    # Get PE Ratio, Dividend info, and Current Price from summary page
+                    if summary_page:
+                        self._merge_page_metrics(metrics, self._get_summary_metrics(summary_page), self.SUMMARY_PAGE_FIELDS)
+                    
+                    # Get Growth Estimates from analysis page
+                    if analysis_page:
+                        self._merge_page_metrics(metrics, self._get_growth_estimates(analysis_page, symbol), self.ANALYSIS_PAGE_FIELDS)
             
         except Exception as e:
             metrics['error'] = f"Error fetching metrics for {symbol}: {str(e)}"
         
+        # Only complete results are remembered so a failed scrape is retried on the next call
+        if not metrics['error']:
+            self._cache[symbol] = (time.time(), dict(metrics))
+        
         return metrics
     
-    def _get_summary_metrics(self, symbol: str) -> Dict[str, Any]:
-        """Extract PE Ratio, Dividend info, and Current Price from Yahoo Finance summary page"""
+    def _merge_page_metrics(self, metrics: Dict[str, Any], page_metrics: Dict[str, Any], fields: Tuple[str, ...]):
+        """Fill unset fields from a scraped page; its error only counts if a field it was fetched for is still unset"""
+        error = page_metrics.pop('error', None)
+        metrics.update({k: v for k, v in page_metrics.items() if metrics.get(k) is None})
+        if error and not metrics['error'] and any(metrics[key] is None for key in fields):
+            metrics['error'] = error
+    
+    def _get_crumb(self) -> Optional[str]:
+        """Return the API crumb for this session, fetching cookies and crumb on first use"""
+        with self._crumb_lock:
+            if self._crumb is None and time.time() >= self._crumb_retry_at:
+                try:
+                    # fc.yahoo.com sets the cookies the crumb is tied to; its status code does not matter
+                    self.rate_limiter.acquire()
+                    self.session.get('https://fc.yahoo.com', timeout=15)
+                    response = self._get('https://query2.finance.yahoo.com/v1/test/getcrumb')
+                    if response.status_code == 200 and response.text:
+                        self._crumb = response.text.strip()
+                except requests.RequestException:
+                    pass
+                if self._crumb is None:
+                    # Don't pay for a failing handshake on every symbol; go straight to HTML for a while
+                    self._crumb_retry_at = time.time() + self.CRUMB_RETRY_SECONDS
+            return self._crumb
+    
+    def _get_via_quote_summary(self, symbol: str) -> Dict[str, Any]:
+        """Read price, PE ratio, dividend and next-year growth from the quoteSummary JSON API"""
         metrics = {}
         
         try:
-            url = f"https://finance.yahoo.com/quote/{quote(symbol.upper())}"
-            response = self.session.get(url, timeout=15)
+            crumb = self._get_crumb()
+            if not crumb:
+                return metrics
             
+            url = (
+                f"https://query2.finance.yahoo.com/v10/finance/quoteSummary/{quote(symbol)}"
+                f"?modules={self.QUOTE_SUMMARY_MODULES}&crumb={quote(crumb)}"
+            )
+            response = self._get(url)
+            if response.status_code == 401:
+                # Crumb expired; the next call fetches a fresh one
+                self._crumb = None
             if response.status_code != 200:
-                return {'error': f"Failed to retrieve summary data: Status code {response.status_code}"}
+                return metrics
+            
+            result = (response.json().get('quoteSummary', {}).get('result') or [{}])[0]
+            price = result.get('price', {})
+            summary = result.get('summaryDetail', {})
+            
+            metrics['current_price'] = price.get('regularMarketPrice', {}).get('raw')
+            metrics['pe_ratio_ttm'] = summary.get('trailingPE', {}).get('raw')
+            metrics['forward_dividend_rate'] = summary.get('dividendRate', {}).get('raw')
+            
+            # The API reports fractions; the rest of the extractor uses percentages
+            dividend_yield = summary.get('dividendYield', {}).get('raw')
+            if dividend_yield is not None:
+                metrics['forward_dividend_yield'] = dividend_yield * 100
+            
+            for trend in result.get('earningsTrend', {}).get('trend', []):
+                if trend.get('period') == '+1y':
+                    growth = trend.get('growth', {}).get('raw')
+                    if growth is not None:
+                        metrics['growth_estimate_next_year'] = growth * 100
+                    break
+            
+        except Exception as e:
+            print(f"Error in quoteSummary metrics: {str(e)}")
+        
+        return {key: value for key, value in metrics.items() if value is not None}
+    
+    def invalidate(self, symbol: str):
+        """Drop the cached metrics for one symbol"""
+        self._cache.pop(symbol.upper(), None)
+    
+    def clear(self):
+        """Drop all cached metrics"""
+        self._cache.clear()
+    
+    def _fetch(self, url: str, ttl_seconds: float) -> Tuple[int, bytes, Optional[str]]:
+        """
+        Return (status code, raw body, charset) for a URL, served from the file cache while fresh.
+        
+        The body stays undecoded so lxml can decode it natively; charset is None when
+        the server did not declare one, leaving detection to the parser.
+        """
+        cached = self.file_cache.get(url, ttl_seconds) if self.file_cache else None
+        if cached:
+            return cached
+        
+        response = self._get(url)
+        content_type = response.headers.get('Content-Type', '').lower()
+        encoding = response.encoding if 'charset=' in content_type else None
+        if self.file_cache and response.status_code == 200:
+            self.file_cache.set(url, response.status_code, response.content, encoding)
+        return response.status_code, response.content, encoding
+    
+    def _get(self, url: str) -> requests.Response:
+        """GET through the rate limiter, backing off and retrying when Yahoo throttles"""
+        for attempt in range(self.MAX_THROTTLE_RETRIES + 1):
+            self.rate_limiter.acquire()
+            response = self.session.get(url, timeout=15)
+            if response.status_code not in (429, 503) or attempt == self.MAX_THROTTLE_RETRIES:
+                return response
+            delay = self._throttle_delay(response, attempt)
+            if delay > self.MAX_THROTTLE_DELAY:
+                # Don't freeze every caller for minutes; slow them down and report the throttling now
+                self.rate_limiter.back_off(self.MAX_THROTTLE_DELAY)
+                return response
+            self.rate_limiter.back_off(delay)
+    
+    def _throttle_delay(self, response: requests.Response, attempt: int) -> float:
+        """Seconds to wait after a throttled response: Retry-After if given, else exponential with jitter"""
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+            try:
+                # HTTP-date form, e.g. "Wed, 21 Oct 2015 07:28:00 GMT"
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+        return self.THROTTLE_BACKOFF_BASE * 2 ** attempt + random.uniform(0, self.THROTTLE_BACKOFF_BASE)
+    
+    def _get_summary_metrics(self, page: Future) -> Dict[str, Any]:
+        """Extract PE Ratio, Dividend info, and Current Price from Yahoo Finance summary page"""
+        metrics = {}
+        
+        try:
+            status_code, body, encoding = page.result()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            if status_code != 200:
+                return {'error': f"Failed to retrieve summary data: Status code {status_code}"}
             
-            # Extract current stock price
-            self._extract_current_price(soup, metrics)
+            # Fast path: targeted CSS selectors on selectolax's C parser
+            tree = LexborHTMLParser(body)
+            absent = self._extract_with_selectors(tree, metrics)
             
-            # Extract PE ratio and dividend info using multiple methods
-            self._extract_by_testid(soup, metrics)
-            self._extract_from_quote_stats(soup, metrics)
-            self._extract_from_tables(soup, metrics)
+            # Extract current stock price from the quote header when the dedicated nodes are absent
+            if not metrics.get('current_price'):
+                self._extract_current_price(tree, metrics)
+            
+            # Fall back to BeautifulSoup for layouts the selectors do not cover; it cannot find a price
+            if self._missing_summary_fields(metrics, absent):
+                index = self._index_soup(BeautifulSoup(body, 'lxml', from_encoding=encoding))
+                
+                # Extract PE ratio and dividend info, walking the wider page only while fields are missing
+                self._extract_from_quote_stats(index, metrics)
+                if self._missing_summary_fields(metrics, absent):
+                    self._extract_from_tables(index, metrics, absent)
             
         except Exception as e:
             metrics['error'] = f"Error in summary metrics: {str(e)}"
         
         return metrics
     
-    def _extract_current_price(self, soup: BeautifulSoup, metrics: Dict[str, Any]):
-        """Extract current stock price from the page"""
+    def _missing_summary_fields(self, metrics: Dict[str, Any], absent: Set[str] = frozenset()) -> List[str]:
+        """Names of the PE ratio / dividend fields not extracted yet and not known to be absent"""
+        return [key for key in self.SUMMARY_FIELDS if metrics.get(key) is None and key not in absent]
+    
+    def _extract_with_selectors(self, tree: LexborHTMLParser, metrics: Dict[str, Any]) -> Set[str]:
+        """Extract current price, PE ratio and dividend info from their data-testid/data-field nodes
+        
+        Returns the fields whose value cell is on the page but empty, so the fallbacks need not look for them
+        """
+        absent = set()
         try:
-            # Method 1: Look for span with data-testid="qsp-price" (most reliable)
-            price_element = soup.find('span', {'data-testid': 'qsp-price'})
-            if price_element:
-                price_text = price_element.get_text(strip=True)
-                price = self._clean_numeric_value(price_text)
-                if price and price > 0:
-                    metrics['current_price'] = price
-                    return
-            
-            # Method 2: Look for fin-streamer with price data
-            price_elements = soup.find_all('fin-streamer', {'data-field': 'regularMarketPrice'})
-            for element in price_elements:
-                value = element.get('value') or element.get_text(strip=True)
-                if value:
-                    price = self._clean_numeric_value(value)
+            # One pass for both price nodes; the qsp-price span wins over any fin-streamer
+            current_price = None
+            for element in tree.css('span[data-testid="qsp-price"], fin-streamer[data-field="regularMarketPrice"]'):
+                if element.tag == 'span':
+                    price = self._clean_numeric_value(element.text(strip=True))
                     if price and price > 0:
+                        current_price = price
+                        break
+                elif current_price is None:
+                    price = self._clean_numeric_value(element.attributes.get('value') or element.text(strip=True))
+                    if price and price > 0:
+                        current_price = price
+            if current_price:
+                metrics['current_price'] = current_price
+            
+            for test_id, metric_key in self.TEST_IDS.items():
+                element = tree.css_first(f'[data-testid="{test_id}"]')
+                if element:
+                    self._apply_testid_value(element.text(strip=True), metric_key, metrics)
+                    absent.update(key for key in self.TEST_ID_FIELDS[metric_key] if metrics.get(key) is None)
+                    
+        except Exception as e:
+            print(f"Error in selector extraction: {str(e)}")
+        
+        return absent
+    
+    def _index_soup(self, soup: BeautifulSoup) -> Dict[str, Any]:
+        """Bucket the elements the fallback extractors look up, in a single walk of the tree"""
+        index = {'tables': [], 'rows': [], 'sections': [], 'testid_elements': [], 'testids': {}}
+        
+        for element in soup.find_all(True):
+            if element.name == 'table':
+                index['tables'].append(element)
+            elif element.name == 'tr':
+                index['rows'].append(element)
+            elif element.name == 'section':
+                index['sections'].append(element)
+            
+            test_id = element.get('data-testid')
+            if test_id:
+                index['testid_elements'].append(element)
+                index['testids'].setdefault(test_id, []).append(element)
+        
+        return index
+    
+    def _find_by_testid(self, index: Dict[str, Any], test_id: str, tag: Optional[str] = None):
+        """First element with the given data-testid (and tag name, if given), or None"""
+        for element in index['testids'].get(test_id, []):
+            if tag is None or element.name == tag:
+                return element
+        return None
+    
+    def _extract_current_price(self, tree: LexborHTMLParser, metrics: Dict[str, Any]):
+        """Extract current stock price from layouts without the qsp-price / fin-streamer nodes"""
+        try:
+            match = _PRICE_RE.match
+            
+            # Method 1: Look for spans with price-like classes in the quote-price section
+            price_spans = tree.css(
+                'section[data-testid="quote-price"] span[class*="price" i], '
+                'section[data-testid="quote-price"] span[class*="qsp" i]'
+            )
+            for span in price_spans:
+                text = span.text(strip=True)
+                # Match patterns like "201.18" (price format)
+                if match(text):
+                    price = self._clean_numeric_value(text)
+                    if price and price > 1:  # Reasonable price threshold
                         metrics['current_price'] = price
                         return
             
-            # Method 3: Look for price in quote-price section
-            quote_price_section = soup.find('section', {'data-testid': 'quote-price'})
-            if quote_price_section:
-                # Look for spans with price-like classes or patterns
-                price_spans = quote_price_section.find_all('span', class_=lambda x: x and ('price' in str(x).lower() or 'qsp' in str(x).lower()))
-                for span in price_spans:
-                    text = span.get_text(strip=True)
-                    # Match patterns like "201.18" (price format)
-                    if re.match(r'^\d{1,4}\.\d{2}$', text):
-                        price = self._clean_numeric_value(text)
-                        if price and price > 1:  # Reasonable price threshold
-                            metrics['current_price'] = price
-                            return
-            
-            # Method 4: Look in the quote header area with improved pattern matching
-            quote_header = soup.find('div', {'data-testid': 'quote-header'}) or soup.find('section', {'data-testid': 'quote-hdr'})
+            # Method 2: Look in the quote header area; lexbor filters the spans, Python only sees their text
+            quote_header = tree.css_first('div[data-testid="quote-header"]') or tree.css_first('section[data-testid="quote-hdr"]')
             if quote_header:
-                # Look for spans that contain price-like values with better pattern
-                spans = quote_header.find_all('span')
-                for span in spans:
-                    text = span.get_text(strip=True)
+                for span in quote_header.css('span'):
+                    text = span.text(strip=True)
                     # More specific pattern for stock prices (e.g., 201.18, 45.67, etc.)
-                    if re.match(r'^\d{1,4}\.\d{2}$', text):
+                    if match(text):
                         price = self._clean_numeric_value(text)
                         if price and price > 1:  # Reasonable price threshold
                             metrics['current_price'] = price
                             return
             
-            # Method 5: Fallback - look for any element with price-like content
-            all_elements = soup.find_all(['span', 'div'], string=re.compile(r'^\d{1,4}\.\d{2}$'))
-            for element in all_elements:
-                text = element.get_text(strip=True)
-                price = self._clean_numeric_value(text)
-                if price and price > 1:
-                    # Additional validation - check if parent has price-related attributes
-                    parent = element.parent
-                    if parent and (parent.get('data-testid') or parent.get('class')):
-                        parent_attrs = str(parent.get('data-testid', '')) + ' ' + ' '.join(parent.get('class', []))
-                        if any(keyword in parent_attrs.lower() for keyword in ['price', 'quote', 'market']):
-                            metrics['current_price'] = price
-                            return
-            
         except Exception as e:
             print(f"Error extracting current price: {str(e)}")
             
-    def _extract_by_testid(self, soup: BeautifulSoup, metrics: Dict[str, Any]):
-        """Extract metrics using data-testid attributes"""
-        test_ids = {
-            'PE_RATIO-value': 'pe_ratio_ttm',
-            'FORWARD_DIVIDEND_AND_YIELD-value': 'forward_dividend_yield',
-            'TD_DIVIDEND_AND_YIELD-value': 'forward_dividend_yield'
-        }
-        
-        for test_id, metric_key in test_ids.items():
-            element = soup.find(attrs={'data-testid': test_id})
-            if element:
-                value = element.get_text(strip=True)
-                if value and value.upper() not in ['N/A', 'NA', '--']:
-                    if metric_key == 'forward_dividend_yield':
-                        self._parse_dividend_info(value, metrics)
-                    elif metric_key == 'pe_ratio_ttm':
-                        metrics[metric_key] = self._clean_numeric_value(value)
+    def _apply_testid_value(self, value: str, metric_key: str, metrics: Dict[str, Any]):
+        """Store the text of a data-testid value cell under its metric"""
+        if value and value.upper() not in ['N/A', 'NA', '--']:
+            if metric_key == 'forward_dividend_yield':
+                self._parse_dividend_info(value, metrics)
+            elif metric_key == 'pe_ratio_ttm':
+                metrics[metric_key] = self._clean_numeric_value(value)
     
-    def _extract_from_quote_stats(self, soup: BeautifulSoup, metrics: Dict[str, Any]):
+    def _extract_from_quote_stats(self, index: Dict[str, Any], metrics: Dict[str, Any]):
         """Extract from quote statistics section"""
         # Look for various quote statistics sections
-        stats_sections = soup.find_all('div', {'data-testid': lambda x: x and 'quote' in x and 'stat' in x})
+        stats_sections = [
+            element for element in index['testid_elements']
+            if element.name == 'div' and 'quote' in element['data-testid'] and 'stat' in element['data-testid']
+        ]
         
         if not stats_sections:
             # Fallback to finding sections with financial data
-            stats_sections = soup.find_all('section', class_=lambda x: x and 'quote' in str(x).lower())
+            stats_sections = [
+                section for section in index['sections']
+                if 'quote' in ' '.join(section.get('class', [])).lower()
+            ]
         
         for section in stats_sections:
             # Look for list items or table rows with labels and values
@@ -186,64 +568,71 @@ class YahooKeyMetricsExtractor:
             
             for item in items:
                 try:
-                    # Try to find label and value pairs
-                    text = item.get_text(strip=True).lower()
+                    # Try to find label and value pairs; the text is collected once per item
+                    item_text = item.get_text(strip=True)
+                    text = item_text.lower()
                     
                     if 'pe ratio' in text or 'p/e ratio' in text:
                         if 'ttm' in text or 'trailing' in text:
                             # Extract the numeric value
-                            numbers = re.findall(r'\d+\.?\d*', item.get_text())
+                            numbers = _NUMBER_RE.findall(item_text)
                             if numbers:
                                 metrics['pe_ratio_ttm'] = self._clean_numeric_value(numbers[-1])
                     
                     elif 'dividend' in text and 'yield' in text:
                         # Look for dividend information
-                        div_text = item.get_text(strip=True)
-                        self._parse_dividend_info(div_text, metrics)
+                        self._parse_dividend_info(item_text, metrics)
                         
                 except Exception:
                     continue
     
-    def _extract_from_tables(self, soup: BeautifulSoup, metrics: Dict[str, Any]):
+    def _extract_from_tables(self, index: Dict[str, Any], metrics: Dict[str, Any], absent: Set[str] = frozenset()):
         """Extract from financial tables"""
-        tables = soup.find_all('table')
-        
-        for table in tables:
-            rows = table.find_all('tr')
-            for row in rows:
-                cells = row.find_all(['td', 'th'])
-                if len(cells) >= 2:
-                    try:
-                        label = cells[0].get_text(strip=True).lower()
-                        value = cells[1].get_text(strip=True)
-                        
-                        if ('pe ratio' in label or 'p/e ratio' in label) and ('ttm' in label or 'trailing' in label):
-                            metrics['pe_ratio_ttm'] = self._clean_numeric_value(value)
-                        elif 'forward annual dividend rate' in label:
-                            metrics['forward_dividend_rate'] = self._clean_numeric_value(value)
-                        elif 'forward annual dividend yield' in label:
-                            metrics['forward_dividend_yield'] = self._clean_percentage_value(value)
-                        elif 'dividend' in label and 'yield' in label and 'forward' in label:
-                            self._parse_dividend_info(value, metrics)
-                            
-                    except Exception:
+        for row in index['rows']:
+            cells = row.find_all(['td', 'th'])
+            if len(cells) >= 2:
+                try:
+                    label = cells[0].get_text(strip=True).lower()
+                    # Most rows are unrelated; skip them before reading the value cell
+                    if not any(key in label for key in _TABLE_LABEL_KEYS):
                         continue
+                    value = cells[1].get_text(strip=True)
+                    
+                    if ('pe ratio' in label or 'p/e ratio' in label) and ('ttm' in label or 'trailing' in label):
+                        metrics['pe_ratio_ttm'] = self._clean_numeric_value(value)
+                    elif 'forward annual dividend rate' in label:
+                        metrics['forward_dividend_rate'] = self._clean_numeric_value(value)
+                    elif 'forward annual dividend yield' in label:
+                        metrics['forward_dividend_yield'] = self._clean_percentage_value(value)
+                    elif 'dividend' in label and 'yield' in label and 'forward' in label:
+                        self._parse_dividend_info(value, metrics)
+                    
+                    # Stop scanning rows once everything has been found
+                    if not self._missing_summary_fields(metrics, absent):
+                        return
+                        
+                except Exception:
+                    continue
     
-    def _get_growth_estimates(self, symbol: str) -> Dict[str, Any]:
+    def _get_growth_estimates(self, page: Future, symbol: str) -> Dict[str, Any]:
         """Extract growth estimates from Yahoo Finance analysis page"""
         metrics = {}
         
         try:
-            url = f"https://finance.yahoo.com/quote/{quote(symbol.upper())}/analysis"
-            response = self.session.get(url, timeout=15)
-            
-            if response.status_code != 200:
-                return {'error': f"Failed to retrieve analysis data: Status code {response.status_code}"}
+            status_code, body, encoding = page.result()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            if status_code != 200:
+                return {'error': f"Failed to retrieve analysis data: Status code {status_code}"}
             
-            # Look for Growth Estimates table
-            growth_estimate = self._extract_growth_estimate_table(soup, symbol)
+            # Stream the page and stop at the Growth Estimates section; build the full tree only if that fails
+            growth_estimate = None
+            if b'growthEstimate' in body:
+                growth_estimate = self._stream_growth_estimate(body, encoding, symbol)
+            if growth_estimate is None:
+                index = self._index_soup(BeautifulSoup(body, 'lxml', from_encoding=encoding))
+                
+                # Look for Growth Estimates table
+                growth_estimate = self._extract_growth_estimate_table(index, symbol)
             if growth_estimate is not None:
                 metrics['growth_estimate_next_year'] = growth_estimate
             
@@ -252,38 +641,65 @@ class YahooKeyMetricsExtractor:
         
         return metrics
     
-    def _extract_growth_estimate_table(self, soup: BeautifulSoup, symbol: str) -> Optional[float]:
+    def _stream_growth_estimate(self, body: bytes, encoding: Optional[str], symbol: str) -> Optional[float]:
+        """Extract growth estimate from the growthEstimate section with an early-exit streaming parse"""
+        try:
+            events = etree.iterparse(io.BytesIO(body), events=('start', 'end'), html=True, encoding=encoding)
+            # Depth of open growthEstimate sections; nothing inside one may be cleared before it is read
+            depth = 0
+            for event, element in events:
+                is_target = element.tag == 'section' and element.get('data-testid') == 'growthEstimate'
+                if event == 'start':
+                    depth += is_target
+                    continue
+                if is_target:
+                    depth -= 1
+                    if depth == 0:
+                        fragment = BeautifulSoup(etree.tostring(element, encoding='unicode', with_tail=False), 'lxml')
+                        table = fragment.find('table')
+                        return self._extract_from_growth_table(table, symbol) if table else None
+                elif depth == 0:
+                    # Drop finished elements and their earlier siblings so memory stays bounded
+                    element.clear()
+                    parent = element.getparent()
+                    if parent is not None:
+                        while element.getprevious() is not None:
+                            del parent[0]
+        except Exception:
+            pass
+        
+        return None
+    
+    def _extract_growth_estimate_table(self, index: Dict[str, Any], symbol: str) -> Optional[float]:
         """Extract growth estimate for next year from the analysis page"""
         try:
             # Method 1: Look for specific Growth Estimates section
-            growth_section = soup.find('section', {'data-testid': 'growthEstimate'})
-            
-            if growth_section:
-                table = growth_section.find('table')
-                if table:
-                    result = self._extract_from_growth_table(table, symbol)
-                    if result is not None:
-                        return result
+            growth_section = self._find_by_testid(index, 'growthEstimate', 'section')
+            table = growth_section.find('table') if growth_section else None
+            if table:
+                result = self._extract_from_growth_table(table, symbol)
+                if result is not None:
+                    return result
             
             # Method 2: Look for tables containing growth estimates
-            tables = soup.find_all('table')
+            tables = index['tables']
+            table_texts = []
             
             for table in tables:
                 table_text = table.get_text().lower()
+                table_texts.append(table_text)
                 if 'growth' in table_text and 'next year' in table_text:
                     result = self._extract_from_growth_table(table, symbol)
                     if result is not None:
                         return result
             
-            # Method 3: Look for any table with "estimate" in nearby text
-            for table in tables:
-                # Check if table or its parent contains growth/estimate keywords
-                parent_text = ""
-                parent = table.parent
-                if parent:
-                    parent_text = parent.get_text().lower()
+            # Method 3: Look for any other table mentioning growth estimates or next year
+            for table, table_text in zip(tables, table_texts):
+                # Tables matched by method 2 were already tried
+                if 'growth' in table_text and 'next year' in table_text:
+                    continue
                 
-                if ('estimate' in parent_text and 'growth' in parent_text) or 'next year' in table.get_text().lower():
+                if ('estimate' in table_text and 'growth' in table_text) or 'next year' in table_text:
                     result = self._extract_from_growth_table(table, symbol)
                     if result is not None:
                         return result
@@ -304,12 +720,12 @@ class YahooKeyMetricsExtractor:
             if not header_row:
                 return None
                 
-            headers = [th.get_text(strip=True) for th in header_row.find_all(['th', 'td'])]
+            headers = [th.get_text(strip=True).lower() for th in header_row.find_all(['th', 'td'])]
             
             # Find "Next Year" column index
             next_year_col_idx = None
             for i, header in enumerate(headers):
-                if any(keyword in header.lower() for keyword in ['next year', 'next 5 years', '2025', '2024']):
+                if any(keyword in header for keyword in _NEXT_YEAR_HEADER_KEYS):
                     next_year_col_idx = i
                     break
             
@@ -324,7 +740,7 @@ class YahooKeyMetricsExtractor:
                     first_cell_text = cells[0].get_text(strip=True).upper()
                     
                     # Check if this is the company row (not S&P 500 or sector)
-                    if (first_cell_text == symbol.upper() or 
+                    if (first_cell_text == symbol or 
                         (len(first_cell_text) <= 6 and first_cell_text.isalpha() and 
                          'S&P' not in first_cell_text and '500' not in first_cell_text and
                          'SECTOR' not in first_cell_text and 'INDUSTRY' not in first_cell_text)):
@@ -342,8 +758,7 @@ class YahooKeyMetricsExtractor:
         """Parse dividend rate and yield from text like '0.25 (1.2%)'"""
         try:
             # Pattern to match: number followed by optional (percentage)
-            pattern = r'(\d+\.?\d*)\s*\((\d+\.?\d*%?)\)'
-            match = re.search(pattern, dividend_text)
+            match = _DIVIDEND_RE.search(dividend_text)
             
             if match:
                 metrics['forward_dividend_rate'] = float(match.group(1))
@@ -351,8 +766,8 @@ class YahooKeyMetricsExtractor:
                 metrics['forward_dividend_yield'] = self._clean_percentage_value(yield_text)
             else:
                 # Try to extract just numbers
-                numbers = re.findall(r'\d+\.?\d*', dividend_text)
-                percentages = re.findall(r'\d+\.?\d*%', dividend_text)
+                numbers = _NUMBER_RE.findall(dividend_text)
+                percentages = _PERCENT_RE.findall(dividend_text)
                 
                 if numbers and not metrics.get('forward_dividend_rate'):
                     metrics['forward_dividend_rate'] = float(numbers[0])
@@ -365,53 +780,60 @@ class YahooKeyMetricsExtractor:
     
     def _clean_numeric_value(self, value: str) -> Optional[float]:
         """Clean and convert numeric value"""
-        if not value or str(value).upper() in ['N/A', 'NA', '--', '', 'NULL']:
+        text = str(value) if value else ''
+        if text.upper() in _MISSING_VALUES:
             return None
         
-        try:
-            # Remove commas and other non-numeric characters except decimal point and minus
-            cleaned = re.sub(r'[^\d.-]', '', str(value))
-            if cleaned and cleaned not in ['-', '.', '-.']:
+        # Remove commas and other non-numeric characters except decimal point and minus
+        cleaned = text.translate(_NUMERIC_CHARS)
+        if cleaned and cleaned not in _BARE_SIGNS:
+            try:
                 return float(cleaned)
-        except (ValueError, TypeError):
-            pass
+            except ValueError:
+                pass
         
         return None
     
     def _clean_percentage_value(self, value: str) -> Optional[float]:
         """Clean and convert percentage value"""
-        if not value or str(value).upper() in ['N/A', 'NA', '--', '', 'NULL']:
-            return None
+        # The % sign is stripped along with every other non-numeric character
+        return self._clean_numeric_value(value)
+    
+    def get_multiple_stocks_metrics(self, symbols: list, max_workers: int = 8) -> Dict[str, Dict[str, Any]]:
+        """Get key metrics for multiple stocks, fetching up to max_workers symbols at once"""
+        results = {}
         
-        try:
-            # Remove % sign and other non-numeric characters except decimal point and minus
-            cleaned = re.sub(r'[^\d.-]', '', str(value))
-            if cleaned and cleaned not in ['-', '.', '-.']:
-                return float(cleaned)
-        except (ValueError, TypeError):
-            pass
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.get_key_metrics, symbol): symbol for symbol in symbols}
+            for i, future in enumerate(as_completed(futures)):
+                symbol = futures[future]
+                print(f"Fetched metrics for {symbol} ({i+1}/{len(symbols)})")
+                results[symbol.upper()] = future.result()
         
-        return None
+        # Report in the order the symbols were given, not the order they finished
+        return {symbol.upper(): results[symbol.upper()] for symbol in symbols}
     
-    def get_multiple_stocks_metrics(self, symbols: list) -> Dict[str, Dict[str, Any]]:
-        """Get key metrics for multiple stocks"""
-        results = {}
+    async def aget_key_metrics(self, symbol: str) -> Dict[str, Any]:
+        """Async variant of get_key_metrics; the blocking fetch runs in a worker thread"""
+        return await asyncio.to_thread(self.get_key_metrics, symbol)
+    
+    async def aget_multiple_stocks_metrics(self, symbols: list, max_concurrency: int = 16) -> Dict[str, Dict[str, Any]]:
+        """Get key metrics for multiple stocks concurrently, at most max_concurrency at a time"""
+        semaphore = asyncio.Semaphore(max_concurrency)
         
-        for i, symbol in enumerate(symbols):
-            print(f"Fetching metrics for {symbol} ({i+1}/{len(symbols)})...")
-            results[symbol.upper()] = self.get_key_metrics(symbol)
-            
-            # Add delay between requests to be respectful
-            if i < len(symbols) - 1:
-                time.sleep(2)
+        async def fetch(symbol: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.aget_key_metrics(symbol)
         
-        return results
+        results = await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+        return {symbol.upper(): metrics for symbol, metrics in zip(symbols, results)}
     
     def save_metrics_to_json(self, metrics: Dict[str, Any], filename: str):
         """Save metrics to JSON file"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(metrics, f, indent=2, ensure_ascii=False)
+            # orjson writes UTF-8 bytes directly, so non-ASCII text is kept as-is
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(metrics, option=orjson.OPT_INDENT_2))
             print(f"Metrics saved to {filename}")
         except Exception as e:
             print(f"Error saving to file: {str(e)}")
@@ -478,4 +900,4 @@ if __name__ == "__main__":
     
     # Pretty print the results
     print("\nComplete results:")
-    print(json.dumps(all_metrics, indent=2))
+    print(orjson.dumps(all_metrics, option=orjson.OPT_INDENT_2).decode())